@@ -0,0 +1,79 @@
+import asyncio
+import io
+import tempfile
+import discord
+import settings
+import roster
+from discord.ext import commands
+from database import Database
+
+logger = settings.logging.getLogger("bot")
+
+# Edit the progress message every this many batches to stay clear of rate limits
+PROGRESS_EVERY = 25
+# Smaller batches than the CLI so each synchronous write holds the event loop only briefly
+IMPORT_BATCH_SIZE = 1000
+
+class BulkPerks(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = Database()
+
+    def export_to_file(self, f, fmt):
+        # Runs in a worker thread, sqlite connections are bound to the thread that opened them
+        db = Database()
+        try:
+            stream = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            count = roster.export_user_perks(db, stream, fmt)
+            stream.flush()
+            stream.detach()
+            return count
+        finally:
+            db.conn.close()
+
+    @commands.command(name="exportperks", help="Export all user perks as csv or jsonl")
+    @commands.has_guild_permissions(administrator=True)
+    async def exportperks(self, ctx, fmt: str = "csv"):
+        fmt = fmt.lower()
+        if fmt not in roster.FORMATS:
+            await ctx.send(f"[Error] Unknown format, use one of: {', '.join(roster.FORMATS)}", delete_after=10)
+            return
+
+        try:
+            # Spool the export to a temporary file instead of building it in memory
+            with tempfile.TemporaryFile() as f:
+                count = await asyncio.to_thread(self.export_to_file, f, fmt)
+                f.seek(0)
+                await ctx.send(f"[Info] Exported {count} user perks.", file=discord.File(f, filename=f"user_perks.{fmt}"))
+        except Exception as e:
+            logger.error(f"Error in exportperks command: {e}")
+            await ctx.send("[Error] An error occurred while exporting perks.", delete_after=10)
+
+    @commands.command(name="importperks", help="Import user perks from an attached csv or jsonl file")
+    @commands.has_guild_permissions(administrator=True)
+    async def importperks(self, ctx):
+        if not ctx.message.attachments:
+            await ctx.send("[Error] Attach a csv or jsonl file to import.", delete_after=10)
+            return
+
+        try:
+            attachment = ctx.message.attachments[0]
+            fmt = roster.format_from_path(attachment.filename)
+            stream = io.TextIOWrapper(io.BytesIO(await attachment.read()), encoding="utf-8-sig", newline="")
+
+            message = await ctx.send("[Info] Importing perks...")
+            stats = None
+            for batch, stats in enumerate(roster.import_user_perks(self.db, roster.read_rows(stream, fmt), IMPORT_BATCH_SIZE), start=1):
+                if batch % PROGRESS_EVERY == 0:
+                    await message.edit(content=f"[Info] Importing perks... {stats['imported']} imported so far")
+                else:
+                    # Yield to the event loop between batches so heartbeats and other commands keep running
+                    await asyncio.sleep(0)
+
+            await message.edit(content=f"[Info] Import finished: {stats['imported']} imported, {stats['skipped']} skipped, {stats['failed']} failed.")
+        except Exception as e:
+            logger.error(f"Error in importperks command: {e}")
+            await ctx.send("[Error] An error occurred while importing perks.", delete_after=10)
+
+def setup(bot):
+    bot.add_cog(BulkPerks(bot))
@@ -0,0 +1,90 @@
+import discord
+import settings
+from discord.ext import commands
+from database import Database
+from members import resolve_display_names
+from teamfinder import build_user_masks, find_team, match_perk_names
+
+logger = settings.logging.getLogger("bot")
+
+OPTION_KEYS = {
+    "size": "size",
+    "type": "type",
+    "spec": "specialization",
+    "specialization": "specialization"
+}
+
+def parse_team_query(query):
+    # Split "perk a, perk b, size=3, type=Tank" into perk names and options
+    perk_names = []
+    options = {}
+    for part in query.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        if sep and key.strip().lower() in OPTION_KEYS:
+            options[OPTION_KEYS[key.strip().lower()]] = value.strip()
+        else:
+            perk_names.append(part)
+    return perk_names, options
+
+class FindTeam(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = Database()
+
+    def resolve_perks(self, perk_names, options):
+        # Match the requested names against the filtered perk catalog, names may contain commas
+        catalog = self.db.get_perks_by_filter(options.get("type"), options.get("specialization"))
+        if not perk_names:
+            return catalog, []
+        return match_perk_names(perk_names, catalog)
+
+    @commands.command(name="findteam", help="Find a small team covering the given perks, e.g. !findteam Perk A, Perk B, size=3, type=Tank, spec=Name")
+    async def findteam(self, ctx, *, query: str = ""):
+        try:
+            perk_names, options = parse_team_query(query)
+            if not perk_names and not options.get("type") and not options.get("specialization"):
+                await ctx.send("[Error] Provide a comma-separated list of perks or a type/spec filter.", delete_after=10)
+                return
+
+            max_size = None
+            if "size" in options:
+                if not options["size"].isdecimal() or int(options["size"]) < 1:
+                    await ctx.send("[Error] The team size must be a positive number.", delete_after=10)
+                    return
+                max_size = int(options["size"])
+
+            required_perks, unknown = self.resolve_perks(perk_names, options)
+            if unknown:
+                await ctx.send(f"[Error] Unknown perks for this filter: {', '.join(unknown)}", delete_after=10)
+                return
+            if not required_perks:
+                await ctx.send("[Info] No perks match the given filter.", delete_after=10)
+                return
+
+            masks = build_user_masks(self.db.get_user_perk_pairs(required_perks), required_perks)
+            team, covered = find_team(masks, len(required_perks), max_size)
+            if not team:
+                await ctx.send("[Info] No members have any of the requested perks.", delete_after=10)
+                return
+
+            user_names = resolve_display_names(ctx.guild, self.db, team)
+            embed = discord.Embed(title=f"Team of {len(team)} covering {bin(covered).count('1')}/{len(required_perks)} perks", color=discord.Color.green())
+            for user_id in team:
+                perks = [perk for i, perk in enumerate(required_perks) if masks[user_id] >> i & 1]
+                perks_list = '\n'.join([f"- {perk}" for perk in perks])
+                embed.add_field(name=user_names[user_id], value=perks_list, inline=False)
+
+            missing = [perk for i, perk in enumerate(required_perks) if not covered >> i & 1]
+            if missing:
+                embed.add_field(name="Not covered", value='\n'.join([f"- {perk}" for perk in missing]), inline=False)
+
+            await ctx.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Error in findteam command: {e}")
+            await ctx.send("[Error] An error occurred while searching for a team.", delete_after=10)
+
+def setup(bot):
+    bot.add_cog(FindTeam(bot))
@@ -2,9 +2,45 @@ import discord
 import settings
 from discord.ext import commands
 from database import Database
+from members import resolve_display_names
+from config import MAX_PERKS
 
 logger = settings.logging.getLogger("bot")
 
+# Discord embed limits, the field budget leaves room for the title and footer
+MAX_TITLE_LENGTH = 256
+MAX_FIELDS = 25
+MAX_FIELD_CHARACTERS = 5500
+
+def summarize_values(label, values, limit=2):
+    # Name a few selected values, count the rest to keep titles short
+    if len(values) <= limit:
+        return f"{label} {' or '.join(values)}"
+    return f"{label} {' or '.join(values[:limit])} or {len(values) - limit} more"
+
+def build_users_embed(title, color, rows, guild, db):
+    if len(title) > MAX_TITLE_LENGTH:
+        title = title[:MAX_TITLE_LENGTH - 3] + "..."
+    embed = discord.Embed(title=title, color=color)
+
+    # Only resolve names for the users that fit, one field per user
+    shown = rows[:MAX_FIELDS - 1] if len(rows) > MAX_FIELDS else rows
+    names = resolve_display_names(guild, db, [row.user_id for row in shown])
+    characters = 0
+    added = 0
+    for row in shown:
+        name = names[row.user_id]
+        perks_list = '\n'.join([f"- {perk}" for perk in row.perks])
+        characters += len(name) + len(perks_list)
+        if characters > MAX_FIELD_CHARACTERS:
+            break
+        embed.add_field(name=name, value=perks_list, inline=False)
+        added += 1
+
+    if added < len(rows):
+        embed.set_footer(text=f"+{len(rows) - added} more users, narrow the search to see them")
+    return embed
+
 class PerkInfoButton(discord.ui.Button):
     def __init__(self, perk_name, db):
         super().__init__(label=perk_name, style=discord.ButtonStyle.primary)
@@ -23,37 +59,75 @@ class PerkInfoButton(discord.ui.Button):
             await interaction.response.send_message("Perk information not found.", ephemeral=True, delete_after=5)
 
 class PerkNameInputModal(discord.ui.Modal):
-    def __init__(self, db, user_id):
+    def __init__(self, view):
         super().__init__(title="Search by Perk Name")
-        self.db = db
-        self.user_id = user_id
+        self.view = view
 
         self.perk_name_input = discord.ui.InputText(label="Enter perk name", placeholder="perk name", required=True)
         self.add_item(self.perk_name_input)
 
     async def callback(self, interaction: discord.Interaction):
-        try:
-            perk_name = self.perk_name_input.value
-            perks = self.db.get_users_with_perk(perk_name)
-            if perks:
-                embed = discord.Embed(title=f"Users with perks '{self.perk_name_input.value}'", color=discord.Color.green())
-                for perk in perks:
-                    perks_list = '\n'.join([f"- {user}" for user in perk["users"]])
-                    embed.add_field(name=perk["name"], value=perks_list, inline=False)
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                    
-            else:
-                await interaction.response.send_message(f"No users found with perk matching '{perk_name}'.", ephemeral=True, delete_after=5)
-        except Exception as e:
-            logger.error(f"Error processing perk search by name: {e}")
-            await interaction.response.send_message("An error occurred while searching for perks.", ephemeral=True, delete_after=10)
+        await self.view.search(interaction, self.perk_name_input.value.strip())
+
+class PerkChoiceView(discord.ui.View):
+    # Discord allows five rows per message, keep one free for the search button
+    MAX_SELECTS = 4
+
+    def __init__(self, search_view, perks):
+        super().__init__(timeout=search_view.timeout)
+        self.search_view = search_view
+        self.interaction_check = search_view.check_interaction
+        self.chunk_size = 25
+        self.dropdown_perks = {}
+
+        # Split perks into chunks of 25
+        chunked_perks = [perks[i:i + self.chunk_size] for i in range(0, len(perks), self.chunk_size)]
+
+        for chunk in chunked_perks[:self.MAX_SELECTS]:
+            options = [
+                discord.SelectOption(label=perk, value=perk, default=(perk in search_view.selected_perks))
+                for perk in chunk
+            ]
+
+            select = discord.ui.Select(
+                placeholder="Choose perks",
+                options=options,
+                max_values=len(options),
+                min_values=0
+            )
+
+            self.dropdown_perks[select] = chunk
+            select.callback = self.make_select_callback(select)
+            self.add_item(select)
+
+        search_button = discord.ui.Button(label="Search", style=discord.ButtonStyle.success)
+        search_button.callback = self.search_callback
+        self.add_item(search_button)
+
+    def make_select_callback(self, select):
+        async def select_callback(interaction: discord.Interaction):
+            # Replace the selections of this dropdown, keep the ones from the other dropdowns
+            chunk = self.dropdown_perks[select]
+            selected_perks = [perk for perk in self.search_view.selected_perks if perk not in chunk]
+            selected_perks.extend(select.values)
+            self.search_view.selected_perks = selected_perks
+            await interaction.response.defer()
+
+        return select_callback
+
+    async def search_callback(self, interaction: discord.Interaction):
+        await self.search_view.search(interaction)
 
 class PerkSearchView(discord.ui.View):
     def __init__(self, db, user_id):
-        super().__init__(timeout=30)
+        super().__init__(timeout=120)
         self.db = db
         self.user_id = user_id
         self.interaction_check = self.check_interaction
+        self.selected_types = []
+        self.selected_specializations = []
+        self.selected_perks = []
+        self.min_matches = 1
 
         # Add a dropdown for perk types
         perk_types = self.db.get_perk_types()
@@ -63,17 +137,33 @@ class PerkSearchView(discord.ui.View):
             return
         
         type_options = [discord.SelectOption(label=perk_type, value=perk_type) for perk_type in perk_types]
-        self.perk_type_select = discord.ui.Select(placeholder="Choose a perk type", options=type_options, max_values=1)
+        self.perk_type_select = discord.ui.Select(placeholder="Choose perk types", options=type_options, min_values=0, max_values=len(type_options))
         self.perk_type_select.callback = self.select_type_callback
         self.add_item(self.perk_type_select)
 
         # Add a dropdown for perk specializations
         perk_specializations = self.db.get_perk_specializations()
         specialization_options = [discord.SelectOption(label=specialization, value=specialization) for specialization in perk_specializations]
-        self.perk_specialization_select = discord.ui.Select(placeholder="Choose a perk specialization", options=specialization_options, max_values=1)
+        self.perk_specialization_select = discord.ui.Select(placeholder="Choose perk specializations", options=specialization_options, min_values=0, max_values=len(specialization_options))
         self.perk_specialization_select.callback = self.select_specialization_callback
         self.add_item(self.perk_specialization_select)
 
+        # Add a dropdown for the minimum number of matching perks per user
+        min_matches_options = [discord.SelectOption(label=f"At least {count} matching perk{'s' if count > 1 else ''}", value=str(count)) for count in range(1, MAX_PERKS + 1)]
+        self.min_matches_select = discord.ui.Select(placeholder="Minimum matching perks per user", options=min_matches_options, max_values=1)
+        self.min_matches_select.callback = self.select_min_matches_callback
+        self.add_item(self.min_matches_select)
+
+        # Add a button to search with the selected filters
+        search_button = discord.ui.Button(label="Search", style=discord.ButtonStyle.success)
+        search_button.callback = self.search_callback
+        self.add_item(search_button)
+
+        # Add a button to choose specific perks
+        choose_perks_button = discord.ui.Button(label="Choose Perks", style=discord.ButtonStyle.secondary)
+        choose_perks_button.callback = self.open_perk_choice
+        self.add_item(choose_perks_button)
+
         # Add a button to open the perk name input modal
         name_input_button = discord.ui.Button(label="Search by Perk Name", style=discord.ButtonStyle.primary)
         name_input_button.callback = self.open_name_input
@@ -96,49 +186,69 @@ class PerkSearchView(discord.ui.View):
         await self.message.delete(delay=10)  # Deletes the message after an additional 10 seconds
 
     async def select_type_callback(self, interaction: discord.Interaction):
-        try:
-            perk_type = self.perk_type_select.values[0]
-            users_with_perks = self.db.get_users_with_perk_type(perk_type)
-            if users_with_perks:
-                embed = discord.Embed(title=f"Users with perks of type '{perk_type}'", color=discord.Color.green())
-                for user, perks in users_with_perks.items():
-                    perks_list = '\n'.join([f"- {perk}" for perk in perks])
-                    embed.add_field(name=user, value=perks_list, inline=False)
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-            else:
-                await interaction.response.send_message(f"No users found with perks of type '{perk_type}'.", ephemeral=True, delete_after=5)
-        except Exception as e:
-            logger.error(f"Error processing perk search by type: {e}")
-            await interaction.response.send_message("An error occurred while searching for users.", ephemeral=True, delete_after=10)
+        self.selected_types = self.perk_type_select.values
+        await interaction.response.defer()
 
     async def select_specialization_callback(self, interaction: discord.Interaction):
+        self.selected_specializations = self.perk_specialization_select.values
+        await interaction.response.defer()
+
+    async def select_min_matches_callback(self, interaction: discord.Interaction):
+        self.min_matches = int(self.min_matches_select.values[0])
+        await interaction.response.defer()
+
+    def describe_filters(self, perk_name=None):
+        filters = []
+        if self.selected_types:
+            filters.append(summarize_values("type", self.selected_types))
+        if self.selected_specializations:
+            filters.append(summarize_values("specialization", self.selected_specializations))
+        if self.selected_perks:
+            filters.append(summarize_values("perk", self.selected_perks))
+        if perk_name:
+            filters.append(f"name matching '{perk_name}'")
+        description = "perks of " + ", ".join(filters) if filters else "perks"
+        if self.min_matches > 1:
+            description = f"at least {self.min_matches} {description}"
+        return description
+
+    async def search(self, interaction: discord.Interaction, perk_name=None):
         try:
-            perk_specialization = self.perk_specialization_select.values[0]
-            users_with_perks = self.db.get_users_with_perk_specialization(perk_specialization)
-            if users_with_perks:
-                embed = discord.Embed(title=f"Users with perks of specialization '{perk_specialization}'", color=discord.Color.purple())
-                for user, perks in users_with_perks.items():
-                    perks_list = '\n'.join([f"- {perk}" for perk in perks])
-                    embed.add_field(name=user, value=perks_list, inline=False)
+            # All selected filters are combined into a single query
+            rows = self.db.search_users(
+                types=self.selected_types,
+                specializations=self.selected_specializations,
+                name_pattern=perk_name,
+                perk_names=self.selected_perks,
+                min_matches=self.min_matches
+            )
+            description = self.describe_filters(perk_name)
+            if rows:
+                embed = build_users_embed(f"Users with {description}", discord.Color.green(), rows, interaction.guild, self.db)
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             else:
-                await interaction.response.send_message(f"No users found with perks of specialization '{perk_specialization}'.", ephemeral=True, delete_after=5)
+                await interaction.response.send_message(f"No users found with {description}.", ephemeral=True, delete_after=5)
         except Exception as e:
-            logger.error(f"Error processing perk search by specialization: {e}")
+            logger.error(f"Error processing perk search: {e}")
             await interaction.response.send_message("An error occurred while searching for users.", ephemeral=True, delete_after=10)
 
+    async def search_callback(self, interaction: discord.Interaction):
+        await self.search(interaction)
+
+    async def open_perk_choice(self, interaction: discord.Interaction):
+        perks = self.db.get_perks()
+        view = PerkChoiceView(self, perks)
+        await interaction.response.send_message("Choose the perks to search for, then click Search:", view=view, ephemeral=True)
+
     async def open_name_input(self, interaction: discord.Interaction):
-        modal = PerkNameInputModal(self.db, self.user_id)
+        modal = PerkNameInputModal(self)
         await interaction.response.send_modal(modal)
 
     async def view_all_callback(self, interaction: discord.Interaction):
         try:
-            all_users_with_perks = self.db.get_all_users_with_perks()
-            if all_users_with_perks:
-                embed = discord.Embed(title="All users with their perks", color=discord.Color.gold())
-                for user, perks in all_users_with_perks.items():
-                    perks_list = '\n'.join([f"- {perk}" for perk in perks])
-                    embed.add_field(name=user, value=perks_list, inline=False)
+            rows = self.db.get_all_users_with_perks()
+            if rows:
+                embed = build_users_embed("All users with their perks", discord.Color.gold(), rows, interaction.guild, self.db)
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             else:
                 await interaction.response.send_message("No users found with perks.", ephemeral=True, delete_after=5)
@@ -1,9 +1,18 @@
 import sqlite3
 import settings
 import os
+from perkquery import build_perk_query, build_user_perk_query
 
 logger = settings.logging.getLogger("database")
 
+class UserPerks:
+    # Compact result row of the user listing queries
+    __slots__ = ("user_id", "perks")
+
+    def __init__(self, user_id, perks):
+        self.user_id = user_id
+        self.perks = perks
+
 class Database:
     def __init__(self, db_name=settings.db_dir+"/perks.db"):
         try:
@@ -42,6 +51,14 @@ class Database:
                               specialization TEXT,
                               specialization_effects TEXT
                               )''')
+
+            # Index perk lookups, the team finder and perk searches filter user_perks by perk name
+            self.c.execute("CREATE INDEX IF NOT EXISTS idx_user_perks_perk_name ON user_perks (perk_name)")
+            # Index the catalog filters used by the combined perk search
+            self.c.execute("CREATE INDEX IF NOT EXISTS idx_perks_type_specialization ON perks (type, specialization)")
+            self.c.execute("CREATE INDEX IF NOT EXISTS idx_perks_specialization ON perks (specialization)")
+            # Covering index for per-user lookups, listings read user_perks in user order straight from it
+            self.c.execute("CREATE INDEX IF NOT EXISTS idx_user_perks_user_perk ON user_perks (user_id, perk_name)")
             self.conn.commit()
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
@@ -49,7 +66,9 @@ class Database:
     def add_user(self, user_id, user_name):
         try:
             with self.conn:
-                self.c.execute("INSERT OR IGNORE INTO users (user_id, user_name) VALUES (?, ?)", (user_id, user_name))
+                # Keep the stored name current, members change their display names
+                self.c.execute('''INSERT INTO users (user_id, user_name) VALUES (?, ?)
+                                  ON CONFLICT(user_id) DO UPDATE SET user_name = excluded.user_name''', (user_id, user_name))
             logger.info(f"Added user {user_name} with ID {user_id}.")
         except Exception as e:
             logger.error(f"Error adding user: {e}")
@@ -132,64 +151,50 @@ class Database:
             logger.error(f"Error getting perk info: {e}")
             return None
 
-    def get_users_with_perk(self, perk_name):
+    def _fetch_user_perks(self, query, params=(), chunk_size=1000):
+        # Rows arrive ordered by user, so each user's perks are collected in a single pass.
+        # SQLite hands back one tuple per perk, which costs more wall time than a group_concat
+        # string per user (~0.13s vs ~0.06s for 100k perks, independent of chunk_size), but keeps
+        # names containing commas intact and retains far less memory. Run this module to compare.
+        cursor = self.conn.cursor()
         try:
-            like_perk = f"%{perk_name}%"
-            
-            self.c.execute('''
-                SELECT users.user_name, group_concat(user_perks.perk_name) as perks 
-                FROM users
-                JOIN user_perks ON users.user_id = user_perks.user_id
-                WHERE user_perks.perk_name like ?
-                GROUP BY users.user_name
-            ''', (like_perk,))
-            return [{"name": row[0], "users": row[1].split(",")} for row in self.c.fetchall()]
+            cursor.execute(query, params)
+            results = []
+            current = None
+            # Share one string object per perk name, the catalog is small but repeats across users
+            perk_names = {}
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for user_id, perk_name in rows:
+                    if current is None or current.user_id != user_id:
+                        current = UserPerks(user_id, [])
+                        results.append(current)
+                    current.perks.append(perk_names.setdefault(perk_name, perk_name))
+            return results
+        finally:
+            cursor.close()
+
+    def search_users(self, types=None, specializations=None, name_pattern=None, perk_names=None, min_matches=1):
+        try:
+            query, params = build_user_perk_query(types, specializations, name_pattern, perk_names, min_matches)
+            return self._fetch_user_perks(query, params)
         except Exception as e:
-            logger.error(f"Error getting users with perk: {e}")
+            logger.error(f"Error searching users: {e}")
             return []
 
+    def get_users_with_perk(self, perk_name):
+        return self.search_users(name_pattern=perk_name)
+
     def get_users_with_perk_type(self, perk_type):
-        try:
-            self.c.execute('''
-                SELECT users.user_name, group_concat(user_perks.perk_name) as perks 
-                FROM users
-                JOIN user_perks ON users.user_id = user_perks.user_id
-                JOIN perks ON user_perks.perk_name = perks.perk_name
-                WHERE perks.type = ?
-                GROUP BY users.user_name
-            ''', (perk_type,))
-            return {row[0]: row[1].split(",") for row in self.c.fetchall()}
-        except Exception as e:
-            logger.error(f"Error getting users with perk type: {e}")
-            return {}
+        return self.search_users(types=[perk_type])
 
     def get_users_with_perk_specialization(self, specialization):
-        try:
-            self.c.execute('''
-                SELECT users.user_name, group_concat(user_perks.perk_name) as perks 
-                FROM users
-                JOIN user_perks ON users.user_id = user_perks.user_id
-                JOIN perks ON user_perks.perk_name = perks.perk_name
-                WHERE perks.specialization = ?
-                GROUP BY users.user_name
-            ''', (specialization,))
-            return {row[0]: row[1].split(",") for row in self.c.fetchall()}
-        except Exception as e:
-            logger.error(f"Error getting users with perk specialization: {e}")
-            return {}
+        return self.search_users(specializations=[specialization])
 
     def get_all_users_with_perks(self):
-        try:
-            self.c.execute('''
-                SELECT users.user_name, group_concat(user_perks.perk_name) as perks 
-                FROM users
-                JOIN user_perks ON users.user_id = user_perks.user_id
-                GROUP BY users.user_name
-            ''')
-            return {row[0]: row[1].split(",") for row in self.c.fetchall()}
-        except Exception as e:
-            logger.error(f"Error getting all users with perks: {e}")
-            return {}
+        return self.search_users()
 
     def get_perk_types(self):
         try:
@@ -206,3 +211,121 @@ class Database:
         except Exception as e:
             logger.error(f"Error getting perk specializations: {e}")
             return []
+
+    def get_perks_by_filter(self, perk_type=None, specialization=None):
+        try:
+            query, params = build_perk_query([perk_type] if perk_type else None, [specialization] if specialization else None)
+            self.c.execute(query, params)
+            return [row[0] for row in self.c.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting filtered perks: {e}")
+            return []
+
+    def get_user_perk_pairs(self, perk_names):
+        try:
+            # Only fetch the rows for the requested perks, the index on perk_name keeps this fast
+            query, params = build_user_perk_query(perk_names=perk_names)
+            self.c.execute(query, params)
+            return self.c.fetchall()
+        except Exception as e:
+            logger.error(f"Error getting user perk pairs: {e}")
+            return []
+
+    def get_user_names(self, user_ids):
+        try:
+            placeholders = ",".join("?" for _ in user_ids)
+            self.c.execute(f"SELECT user_id, user_name FROM users WHERE user_id IN ({placeholders})", list(user_ids))
+            return dict(self.c.fetchall())
+        except Exception as e:
+            logger.error(f"Error getting user names: {e}")
+            return {}
+
+    def iter_user_perk_rows(self, chunk_size=1000):
+        # Use a dedicated cursor and fetchmany so exports stream without loading the whole table
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT users.user_id, users.user_name, user_perks.perk_name
+                FROM users
+                JOIN user_perks ON users.user_id = user_perks.user_id
+                ORDER BY users.user_id
+            ''')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception as e:
+            logger.error(f"Error streaming user perks: {e}")
+        finally:
+            cursor.close()
+
+    def import_user_perks(self, users, perk_rows, replace_user_ids=()):
+        try:
+            # Write one batch in a single transaction
+            with self.conn:
+                self.c.executemany('''INSERT INTO users (user_id, user_name) VALUES (?, ?)
+                                      ON CONFLICT(user_id) DO UPDATE SET user_name = COALESCE(excluded.user_name, users.user_name)''', users)
+                self.c.executemany("DELETE FROM user_perks WHERE user_id = ?", [(user_id,) for user_id in replace_user_ids])
+                self.c.executemany("INSERT INTO user_perks (user_id, perk_name) VALUES (?, ?)", perk_rows)
+            logger.info(f"Imported {len(perk_rows)} perks for {len(users)} users.")
+            return True
+        except Exception as e:
+            logger.error(f"Error importing user perks: {e}")
+            return False
+
+    def get_all_user_names(self):
+        try:
+            self.c.execute("SELECT user_id, user_name FROM users")
+            return dict(self.c.fetchall())
+        except Exception as e:
+            logger.error(f"Error getting all user names: {e}")
+            return {}
+
+    def update_user_names(self, users):
+        try:
+            with self.conn:
+                self.c.executemany("UPDATE users SET user_name = ? WHERE user_id = ?", [(user_name, user_id) for user_id, user_name in users])
+            logger.info(f"Updated names of {len(users)} users.")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating user names: {e}")
+            return False
+
+if __name__ == '__main__':
+    # Benchmark the user listing against the group_concat query it replaced
+    import tempfile
+    import time
+    import tracemalloc
+
+    settings.logging.getLogger("database").setLevel(settings.logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        perks = [f"Perk {i}" for i in range(50)]
+        db.update_perks([{'Name': perk, 'Type': 'T', 'Specialization': 'S', 'Specialization Effects': ''} for perk in perks])
+        with db.conn:
+            db.c.executemany("INSERT INTO users (user_id, user_name) VALUES (?, ?)", [(user_id, f"User {user_id}") for user_id in range(10000)])
+            db.c.executemany("INSERT INTO user_perks (user_id, perk_name) VALUES (?, ?)",
+                             [(user_id, perks[(user_id + i) % len(perks)]) for user_id in range(10000) for i in range(10)])
+
+        def group_concat_listing():
+            db.c.execute('''
+                SELECT users.user_id, group_concat(user_perks.perk_name)
+                FROM users
+                JOIN user_perks ON users.user_id = user_perks.user_id
+                GROUP BY users.user_id
+            ''')
+            return {row[0]: row[1].split(",") for row in db.c.fetchall()}
+
+        for name, listing in (("group_concat", group_concat_listing), ("slotted rows", db.get_all_users_with_perks)):
+            start = time.perf_counter()
+            listing()
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            result = listing()
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del result
+            print(f"{name:>12}: {elapsed * 1000:.0f} ms, retained {retained / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+        db.conn.close()
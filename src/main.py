@@ -3,22 +3,28 @@ from config import DISCORD_TOKEN
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from scraper import update_perks
 from botmanager import BotManager
+from database import Database
+from members import refresh_member_names
 
 if __name__ == "__main__":
     intents = discord.Intents.default()
     intents.message_content = True
+    intents.members = True  # Needed to resolve current display names from the member cache
     bot = BotManager(command_prefix='!', intents=intents)
 
 
     update_perks()
     scheduler = AsyncIOScheduler()
     scheduler.add_job(update_perks, 'interval', days=1)
+    scheduler.add_job(refresh_member_names, 'interval', hours=1, args=[bot, Database()])
     scheduler.start()
 
     bot.load_extension('cogs.viewperks')
     bot.load_extension('cogs.addperks')
     bot.load_extension('cogs.clearperks')
     bot.load_extension('cogs.updatedb')
+    bot.load_extension('cogs.findteam')
+    bot.load_extension('cogs.bulkperks')
     bot.add_check(bot.channel_check)
 
     bot.run(DISCORD_TOKEN)
\ No newline at end of file
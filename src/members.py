@@ -0,0 +1,44 @@
+import asyncio
+import settings
+
+logger = settings.logging.getLogger("bot")
+
+NAME_BATCH_SIZE = 500
+# Pause between batches so the refresh never holds up interactive writes
+NAME_BATCH_DELAY = 1
+
+def resolve_display_names(guild, db, user_ids):
+    # Prefer the live display name from the member cache, fall back to the stored name
+    names = {}
+    missing = []
+    for user_id in user_ids:
+        member = guild.get_member(user_id) if guild else None
+        if member:
+            names[user_id] = member.display_name
+        else:
+            missing.append(user_id)
+
+    if missing:
+        stored = db.get_user_names(missing)
+        for user_id in missing:
+            names[user_id] = stored.get(user_id) or str(user_id)
+    return names
+
+async def refresh_member_names(bot, db):
+    # Collect the stored names that no longer match the member cache
+    stored = db.get_all_user_names()
+    changed = []
+    for user_id, user_name in stored.items():
+        for guild in bot.guilds:
+            member = guild.get_member(user_id)
+            if member:
+                if member.display_name != user_name:
+                    changed.append((user_id, member.display_name))
+                break
+
+    for i in range(0, len(changed), NAME_BATCH_SIZE):
+        db.update_user_names(changed[i:i + NAME_BATCH_SIZE])
+        await asyncio.sleep(NAME_BATCH_DELAY)
+
+    if changed:
+        logger.info(f"Refreshed {len(changed)} member names.")
@@ -0,0 +1,46 @@
+def _in_clause(column, values, params):
+    params.extend(values)
+    return f"{column} IN ({','.join('?' for _ in values)})"
+
+def build_perk_query(types=None, specializations=None):
+    # Catalog query for the perk names matching the type and specialization filters
+    conditions = []
+    params = []
+    if types:
+        conditions.append(_in_clause("type", list(types), params))
+    if specializations:
+        conditions.append(_in_clause("specialization", list(specializations), params))
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT perk_name FROM perks{where}", params
+
+def build_user_perk_query(types=None, specializations=None, name_pattern=None, perk_names=None, min_matches=1):
+    """Build one query returning (user_id, perk_name) rows ordered by user for the combined filters.
+
+    All filters are ANDed and apply to individual perks, min_matches keeps only users
+    with at least that many matching perks. Returns the SQL and its parameters.
+    """
+    # Catalog filters narrow the set of perk names first, user_perks is then probed
+    # through its perk_name index. Without any filter the covering user index is scanned.
+    conditions = []
+    params = []
+    if types or specializations:
+        catalog_query, catalog_params = build_perk_query(types, specializations)
+        conditions.append(f"user_perks.perk_name IN ({catalog_query})")
+        params.extend(catalog_params)
+    if perk_names:
+        conditions.append(_in_clause("user_perks.perk_name", list(perk_names), params))
+    if name_pattern:
+        conditions.append("user_perks.perk_name LIKE ?")
+        params.append(f"%{name_pattern}%")
+
+    if min_matches > 1:
+        # Count the matching perks per user in a subquery over the same filters
+        filtered = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        conditions.append(f"user_perks.user_id IN (SELECT user_perks.user_id FROM user_perks{filtered} GROUP BY user_perks.user_id HAVING COUNT(*) >= ?)")
+        params = params + params + [min_matches]
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Join users so perks of members without a users row stay hidden, like the original listings
+    query = f"SELECT user_perks.user_id, user_perks.perk_name FROM user_perks JOIN users ON users.user_id = user_perks.user_id{where} ORDER BY user_perks.user_id"
+    return query, params
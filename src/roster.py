@@ -0,0 +1,145 @@
+import argparse
+import csv
+import json
+import os
+import settings
+from config import MAX_PERKS
+from database import Database
+
+logger = settings.logging.getLogger("database")
+
+FIELDS = ['user_id', 'user_name', 'perk_name']
+FORMATS = ['csv', 'jsonl']
+BATCH_SIZE = 5000
+
+def format_from_path(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "json") else "csv"
+
+def export_user_perks(db, stream, fmt="csv", chunk_size=BATCH_SIZE):
+    # Write one line per user perk, rows are streamed from the database in chunks
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+        for row in db.iter_user_perk_rows(chunk_size):
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in db.iter_user_perk_rows(chunk_size):
+            stream.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + "\n")
+            count += 1
+    logger.info(f"Exported {count} user perks as {fmt}.")
+    return count
+
+def read_rows(stream, fmt="csv"):
+    # Malformed lines are yielded as None so the importer can count them as skipped
+    # Spreadsheet exports often start with a byte-order mark, drop it if the stream was not decoded with utf-8-sig
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames:
+            reader.fieldnames[0] = reader.fieldnames[0].lstrip("\ufeff")
+        while True:
+            try:
+                yield next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield None
+    else:
+        for line in stream:
+            line = line.strip().lstrip("\ufeff")
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+def parse_user_id(value):
+    # Only accept whole numbers, never truncate values like 1.9
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value.strip())
+    return None
+
+def import_user_perks(db, rows, batch_size=BATCH_SIZE):
+    """Import user perk rows in batches, yielding the running stats after every batch.
+
+    Rows naming a perk missing from the catalog, duplicates, perks beyond MAX_PERKS
+    per user and malformed rows are skipped. Imported users have their existing perks
+    replaced. If a batch fails, the later rows of its users are counted as failed too.
+    """
+    catalog = set(db.get_perks())
+    stats = {"imported": 0, "skipped": 0, "failed": 0}
+    perk_counts = {}
+    failed_users = set()
+    users, perk_rows, new_user_ids = {}, [], []
+
+    def flush():
+        if db.import_user_perks(list(users.items()), perk_rows, new_user_ids):
+            stats["imported"] += len(perk_rows)
+        else:
+            stats["failed"] += len(perk_rows)
+            # The batch rolled back, so these users were never replaced
+            failed_users.update(users)
+        users.clear()
+        perk_rows.clear()
+        new_user_ids.clear()
+
+    for row in rows:
+        if not isinstance(row, dict):
+            stats["skipped"] += 1
+            continue
+
+        user_id = parse_user_id(row.get("user_id"))
+        perk_name = row.get("perk_name")
+        if user_id is None or not isinstance(perk_name, str):
+            stats["skipped"] += 1
+            continue
+
+        if user_id in failed_users:
+            stats["failed"] += 1
+            continue
+
+        # Only cut a batch between users, so one user's rows normally commit together
+        if len(perk_rows) >= batch_size and user_id not in users:
+            flush()
+            yield stats
+
+        user_perks = perk_counts.setdefault(user_id, set())
+        if perk_name not in catalog or perk_name in user_perks or len(user_perks) >= MAX_PERKS:
+            stats["skipped"] += 1
+            continue
+
+        if not user_perks:
+            # First valid perk for this user, replace whatever they had before
+            new_user_ids.append(user_id)
+        user_perks.add(perk_name)
+        user_name = row.get("user_name")
+        # Rosters often only carry IDs, None keeps the name already stored for the member
+        users[user_id] = user_name if isinstance(user_name, str) and user_name else None
+        perk_rows.append((user_id, perk_name))
+
+    if perk_rows:
+        flush()
+    yield stats
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import or export user perk assignments")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("--format", choices=FORMATS, help="File format, defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or format_from_path(args.path)
+    db = Database()
+    if args.action == "export":
+        with open(args.path, "w", newline="", encoding="utf-8") as f:
+            export_user_perks(db, f, fmt, args.batch_size)
+    else:
+        with open(args.path, newline="", encoding="utf-8-sig") as f:
+            for stats in import_user_perks(db, read_rows(f, fmt), args.batch_size):
+                logger.info(f"Import progress: {stats['imported']} imported, {stats['skipped']} skipped, {stats['failed']} failed")
@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import config
 import settings
@@ -7,6 +6,7 @@ import re
 import html
 from io import BytesIO
 from database import Database
+from snapshot import hash_source, load_snapshot, save_snapshot
 
 logger = settings.logging.getLogger("scraper")
 
@@ -23,6 +23,40 @@ def decode_hex_and_entities(text):
     
     return text.replace('_x000D_', '')
 
+def parse_workbook(data, decode=False):
+    # Import pandas lazily, warm starts served from the snapshot never need it
+    import pandas as pd
+
+    # Read the Excel workbook
+    df = pd.read_excel(BytesIO(data), engine='openpyxl')
+
+    # Extract specific columns
+    required_columns = ['Name', 'Type', 'Specialization', 'Specialization Effects']
+    if not all(column in df.columns for column in required_columns):
+        logger.error("The required columns are not present in the Excel file.")
+        return []
+
+    # Decode hex and HTML entities in the required columns
+    if decode:
+        for column in required_columns:
+            df[column] = df[column].apply(lambda x: decode_hex_and_entities(x) if isinstance(x, str) else x)
+
+    # Extract the required columns
+    return df[required_columns].dropna().to_dict(orient='records')
+
+def load_perks(data, decode=False):
+    # Reuse the binary snapshot when the workbook is unchanged, parsing it is the slow part
+    source_hash = hash_source(data, b"decoded" if decode else b"")
+    perks = load_snapshot(source_hash)
+    if perks is not None:
+        logger.info("Perks loaded from the catalog snapshot.")
+        return perks
+
+    perks = parse_workbook(data, decode)
+    if perks:
+        save_snapshot(perks, source_hash)
+    return perks
+
 def scrape_perks_from_file(file_path):
     try:
         # Ensure the file exists
@@ -30,18 +64,10 @@ def scrape_perks_from_file(file_path):
             logger.error(f"The file {file_path} does not exist.")
             return []
 
-        # Read the Excel file
-        df = pd.read_excel(file_path, engine='openpyxl')
-
-        # Extract specific columns
-        required_columns = ['Name', 'Type', 'Specialization', 'Specialization Effects']
-        if not all(column in df.columns for column in required_columns):
-            logger.error("The required columns are not present in the Excel file.")
-            return []
-
-        # Extract the required columns
-        perks = df[required_columns].dropna().to_dict(orient='records')
-        logger.info("Perks scraped from the local Excel file.")
+        with open(file_path, 'rb') as f:
+            perks = load_perks(f.read())
+        if perks:
+            logger.info("Perks scraped from the local Excel file.")
         return perks
     except Exception as e:
         logger.error(f"Error processing the Excel file: {e}")
@@ -61,23 +87,9 @@ def scrape_perks_from_url(url):
             logger.error("The URL does not point to a valid Excel file.")
             return []
 
-        # Read the Excel file
-        excel_data = BytesIO(response.content)
-        df = pd.read_excel(excel_data, engine='openpyxl')
-
-        # Extract specific columns
-        required_columns = ['Name', 'Type', 'Specialization', 'Specialization Effects']
-        if not all(column in df.columns for column in required_columns):
-            logger.error("The required columns are not present in the Excel file.")
-            return []
-
-        # Decode hex and HTML entities in the required columns
-        for column in required_columns:
-            df[column] = df[column].apply(lambda x: decode_hex_and_entities(x) if isinstance(x, str) else x)
-
-        # Extract the required columns
-        perks = df[required_columns].dropna().to_dict(orient='records')
-        logger.info("Perks scraped from the online Excel file.")
+        perks = load_perks(response.content, decode=True)
+        if perks:
+            logger.info("Perks scraped from the online Excel file.")
         return perks
     except requests.RequestException as e:
         logger.error(f"Error fetching perks from {url}: {e}")
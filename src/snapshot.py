@@ -0,0 +1,92 @@
+import hashlib
+import os
+import struct
+import time
+import settings
+
+logger = settings.logging.getLogger("scraper")
+
+SNAPSHOT_PATH = os.path.join(settings.db_dir, "perks_catalog.bin")
+COLUMNS = ['Name', 'Type', 'Specialization', 'Specialization Effects']
+
+# Layout: magic, format version, sha256 of the source workbook, record count,
+# then every record as len-prefixed UTF-8 strings in COLUMNS order
+MAGIC = b"PRKS"
+VERSION = 1
+HEADER = struct.Struct("<4sH32sI")
+LENGTH = struct.Struct("<I")
+
+def hash_source(data, variant=b""):
+    # variant separates snapshots of the same workbook that were cleaned differently
+    digest = hashlib.sha256(data)
+    digest.update(variant)
+    return digest.digest()
+
+def save_snapshot(perks, source_hash, path=SNAPSHOT_PATH):
+    try:
+        parts = [HEADER.pack(MAGIC, VERSION, source_hash, len(perks))]
+        for perk in perks:
+            for column in COLUMNS:
+                value = str(perk[column]).encode("utf-8")
+                parts.append(LENGTH.pack(len(value)))
+                parts.append(value)
+
+        # Write to a temporary file first so a crash never leaves a half written snapshot
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved catalog snapshot with {len(perks)} perks.")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving catalog snapshot: {e}")
+        return False
+
+def load_snapshot(source_hash, path=SNAPSHOT_PATH):
+    # Returns the cached perks if the snapshot was built from the same workbook, otherwise None
+    try:
+        if not os.path.isfile(path):
+            return None
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        magic, version, snapshot_hash, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or snapshot_hash != source_hash:
+            return None
+
+        perks = []
+        offset = HEADER.size
+        for _ in range(count):
+            perk = {}
+            for column in COLUMNS:
+                (length,) = LENGTH.unpack_from(data, offset)
+                offset += LENGTH.size
+                if offset + length > len(data):
+                    logger.warning("Catalog snapshot is truncated, ignoring it.")
+                    return None
+                perk[column] = data[offset:offset + length].decode("utf-8")
+                offset += length
+            perks.append(perk)
+
+        if offset != len(data):
+            logger.warning("Catalog snapshot has trailing data, ignoring it.")
+            return None
+        return perks
+    except Exception as e:
+        logger.error(f"Error loading catalog snapshot: {e}")
+        return None
+
+if __name__ == '__main__':
+    # Benchmark the load of a synthetic 1000 perk catalog
+    path = SNAPSHOT_PATH + ".bench"
+    perks = [{column: f"{column} {i}" for column in COLUMNS} for i in range(1000)]
+    source_hash = hash_source(b"benchmark")
+    save_snapshot(perks, source_hash, path)
+
+    start = time.perf_counter()
+    loaded = load_snapshot(source_hash, path)
+    elapsed = time.perf_counter() - start
+
+    os.remove(path)
+    print(f"Loaded {len(loaded)} perks in {elapsed * 1000:.2f} ms")
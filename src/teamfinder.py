@@ -0,0 +1,122 @@
+# Above this many required perks the exact search gets too expensive, fall back to greedy
+EXACT_SEARCH_LIMIT = 10
+
+def _normalize_perk_name(name):
+    return ", ".join(part.strip() for part in name.lower().split(","))
+
+def match_perk_names(parts, catalog):
+    """Match comma-split query parts to catalog perks, returning (resolved, unknown).
+
+    Perk names may contain commas themselves, so neighbouring parts are rejoined
+    and the longest run matching a catalog name wins. Matching ignores case.
+    """
+    lookup = {_normalize_perk_name(perk): perk for perk in catalog}
+    resolved, unknown = [], []
+    i = 0
+    while i < len(parts):
+        for j in range(len(parts), i, -1):
+            perk = lookup.get(_normalize_perk_name(", ".join(parts[i:j])))
+            if perk is not None:
+                if perk not in resolved:
+                    resolved.append(perk)
+                i = j
+                break
+        else:
+            unknown.append(parts[i])
+            i += 1
+    return resolved, unknown
+
+def build_user_masks(rows, required_perks):
+    # Map every required perk to a bit and OR the bits of each user's perks together
+    perk_bits = {perk: 1 << i for i, perk in enumerate(required_perks)}
+    masks = {}
+    for user_id, perk_name in rows:
+        bit = perk_bits.get(perk_name)
+        if bit:
+            masks[user_id] = masks.get(user_id, 0) | bit
+    return masks
+
+def _distinct_masks(masks):
+    # Keep a single user per distinct mask, members with identical perks are interchangeable
+    by_mask = {}
+    for user_id, mask in masks.items():
+        if mask and mask not in by_mask:
+            by_mask[mask] = user_id
+    return by_mask
+
+def _prune_masks(by_mask):
+    # Drop masks that are a subset of another one, they can never shrink a minimum team
+    candidates = sorted(by_mask, key=lambda m: bin(m).count("1"), reverse=True)
+    kept = []
+    for mask in candidates:
+        if not any(mask & other == mask for other in kept):
+            kept.append(mask)
+    return [(by_mask[mask], mask) for mask in kept]
+
+def _greedy_cover(candidates, full_mask, max_size=None):
+    team = []
+    covered = 0
+    while covered != full_mask and (max_size is None or len(team) < max_size):
+        best_user, best_gain = None, 0
+        for user_id, mask in candidates:
+            gain = bin(mask & ~covered).count("1")
+            if gain > best_gain:
+                best_user, best_gain, best_mask = user_id, gain, mask
+        if best_user is None:
+            break
+        team.append(best_user)
+        covered |= best_mask
+    return team, covered
+
+def _exact_cover(candidates, full_mask, max_size):
+    # Breadth-first search over covered-perk states, the first state reaching full_mask is a minimum team
+    parents = {0: None}
+    frontier = [0]
+    depth = 0
+    while frontier and depth < max_size:
+        depth += 1
+        next_frontier = []
+        for state in frontier:
+            for user_id, mask in candidates:
+                new_state = state | mask
+                if new_state in parents:
+                    continue
+                parents[new_state] = (state, user_id)
+                if new_state == full_mask:
+                    team = []
+                    while parents[new_state] is not None:
+                        new_state, member = parents[new_state]
+                        team.append(member)
+                    return team[::-1]
+                next_frontier.append(new_state)
+        frontier = next_frontier
+    return None
+
+def find_team(masks, perk_count, max_size=None):
+    """Return (team, covered_mask) for the smallest set of users covering perk_count perks.
+
+    masks maps user IDs to bitsets built by build_user_masks. If no full cover fits in
+    max_size members, the greedy best partial cover within that size is returned instead.
+    """
+    full_mask = (1 << perk_count) - 1
+    by_mask = _distinct_masks(masks)
+    if perk_count <= EXACT_SEARCH_LIMIT:
+        candidates = _prune_masks(by_mask)
+    else:
+        candidates = [(user_id, mask) for mask, user_id in by_mask.items()]
+
+    team, covered = _greedy_cover(candidates, full_mask)
+    if covered != full_mask:
+        # Some perks are not owned by anyone, return the best team within the size limit
+        return _greedy_cover(candidates, full_mask, max_size)
+
+    # Greedy gives an upper bound, only search for a smaller team if one could exist
+    limit = len(team) - 1 if max_size is None else min(len(team) - 1, max_size)
+    if perk_count <= EXACT_SEARCH_LIMIT and limit > 1:
+        exact_team = _exact_cover(candidates, full_mask, limit)
+        if exact_team is not None:
+            return exact_team, full_mask
+
+    if max_size is not None and len(team) > max_size:
+        return _greedy_cover(candidates, full_mask, max_size)
+    return team, covered
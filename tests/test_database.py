@@ -0,0 +1,37 @@
+import pytest
+from database import Database
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "perks.db"))
+    db.update_perks([
+        {'Name': 'Shield, Heavy', 'Type': 'Tank', 'Specialization': 'Guard', 'Specialization Effects': ''},
+        {'Name': 'Heal', 'Type': 'Support', 'Specialization': 'Medic', 'Specialization Effects': ''},
+    ])
+    return db
+
+def test_listing_keeps_perk_names_with_commas(db):
+    db.add_user(1, "a")
+    db.add_user_perks(1, ['Shield, Heavy', 'Heal'])
+
+    rows = db.get_all_users_with_perks()
+    assert [(row.user_id, sorted(row.perks)) for row in rows] == [(1, ['Heal', 'Shield, Heavy'])]
+
+def test_listing_skips_perks_without_user(db):
+    db.add_user(1, "a")
+    db.add_user_perks(1, ['Heal'])
+    db.add_user_perks(2, ['Heal'])
+
+    assert [row.user_id for row in db.get_users_with_perk_type('Support')] == [1]
+
+def test_search_combines_filters(db):
+    db.add_user(1, "a")
+    db.add_user_perks(1, ['Shield, Heavy', 'Heal'])
+    db.add_user(2, "b")
+    db.add_user_perks(2, ['Heal'])
+
+    assert [row.user_id for row in db.search_users(perk_names=['Shield, Heavy', 'Heal'], min_matches=2)] == [1]
+    assert [row.user_id for row in db.search_users(types=['Support'], specializations=['Medic'])] == [1, 2]
+    assert db.search_users(types=['Tank'], specializations=['Medic']) == []
+    assert db.get_perks_by_filter(specialization='Guard') == ['Shield, Heavy']
+    assert sorted(db.get_user_perk_pairs(['Heal'])) == [(1, 'Heal'), (2, 'Heal')]
@@ -0,0 +1,94 @@
+import io
+import pytest
+import roster
+from database import Database
+
+PERKS = [f"P{i}" for i in range(20)]
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "perks.db"))
+    db.update_perks([{'Name': perk, 'Type': 'T', 'Specialization': 'S', 'Specialization Effects': 'e'} for perk in PERKS])
+    return db
+
+def run_import(db, rows, batch_size=roster.BATCH_SIZE):
+    stats = None
+    for stats in roster.import_user_perks(db, rows, batch_size):
+        pass
+    return stats
+
+def test_failed_batch_keeps_existing_perks(db, monkeypatch):
+    db.add_user(1, "old")
+    db.add_user_perks(1, PERKS[:10])
+
+    original = db.import_user_perks
+    calls = []
+    def fail_first(*args):
+        calls.append(args)
+        return False if len(calls) == 1 else original(*args)
+    monkeypatch.setattr(db, "import_user_perks", fail_first)
+
+    rows = [{"user_id": 1, "user_name": "new", "perk_name": perk} for perk in PERKS[10:]]
+    rows.append({"user_id": 2, "user_name": "other", "perk_name": "P0"})
+    stats = run_import(db, rows, batch_size=5)
+
+    assert sorted(db.get_user_perks(1)) == sorted(PERKS[:10])
+    assert db.get_user_perks(2) == ["P0"]
+    assert stats["failed"] == 10
+
+def test_malformed_rows_are_skipped(db):
+    data = "\n".join([
+        '{"user_id": 1, "user_name": "a", "perk_name": "P1"}',
+        '{"user_id": 1, "perk_name": ',
+        '{"user_id": 1, "perk_name": ["P2"]}',
+        '{"user_id": 1.9, "perk_name": "P3"}',
+        '{"user_id": "2", "perk_name": "P4"}',
+        '{"user_id": 3, "perk_name": "Unknown"}',
+    ])
+    stats = run_import(db, roster.read_rows(io.StringIO(data), "jsonl"))
+
+    assert stats == {"imported": 2, "skipped": 4, "failed": 0}
+    assert db.get_user_perks(1) == ["P1"]
+    assert db.get_user_perks(2) == ["P4"]
+
+def test_export_import_round_trip(db, tmp_path):
+    db.add_user(1, "a")
+    db.add_user_perks(1, ["P1", "P2"])
+
+    out = io.StringIO()
+    assert roster.export_user_perks(db, out, "csv") == 2
+
+    other = Database(str(tmp_path / "other.db"))
+    other.update_perks([{'Name': perk, 'Type': 'T', 'Specialization': 'S', 'Specialization Effects': 'e'} for perk in PERKS])
+    out.seek(0)
+    stats = run_import(other, roster.read_rows(out, "csv"))
+
+    assert stats["imported"] == 2
+    assert sorted(other.get_user_perks(1)) == ["P1", "P2"]
+
+def test_import_updates_stored_names(db):
+    db.add_user(1, "old")
+    run_import(db, [{"user_id": 1, "user_name": "new", "perk_name": "P1"}])
+
+    assert db.get_user_names([1]) == {1: "new"}
+
+def test_import_without_names_keeps_stored_names(db):
+    db.add_user(42, "Alice")
+    run_import(db, roster.read_rows(io.StringIO("user_id,perk_name\n42,P1\n43,P2\n"), "csv"))
+
+    assert db.get_user_names([42, 43]) == {42: "Alice", 43: None}
+    assert db.get_user_perks(42) == ["P1"]
+
+@pytest.mark.parametrize("fmt, data", [
+    ("csv", "user_id,perk_name\n1,P1\n"),
+    ("jsonl", '{"user_id": 1, "perk_name": "P1"}\n'),
+])
+def test_import_with_byte_order_mark(db, tmp_path, fmt, data):
+    path = tmp_path / f"roster.{fmt}"
+    path.write_bytes(b"\xef\xbb\xbf" + data.encode("utf-8"))
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        assert run_import(db, roster.read_rows(f, fmt)) == {"imported": 1, "skipped": 0, "failed": 0}
+    # Streams decoded as plain utf-8 keep the mark, read_rows strips it as well
+    with open(path, newline="", encoding="utf-8") as f:
+        assert run_import(db, roster.read_rows(f, fmt))["imported"] == 1
@@ -0,0 +1,35 @@
+import snapshot
+
+PERKS = [
+    {'Name': 'Iron Skin', 'Type': 'Tank', 'Specialization': 'Guard', 'Specialization Effects': 'Block, parry & ä'},
+    {'Name': 'Quick Hands', 'Type': 'Support', 'Specialization': 'Medic', 'Specialization Effects': ''},
+]
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    source_hash = snapshot.hash_source(b"workbook")
+
+    assert snapshot.save_snapshot(PERKS, source_hash, path)
+    assert snapshot.load_snapshot(source_hash, path) == PERKS
+
+def test_stale_hash_is_rejected(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    snapshot.save_snapshot(PERKS, snapshot.hash_source(b"workbook"), path)
+
+    assert snapshot.load_snapshot(snapshot.hash_source(b"changed"), path) is None
+    assert snapshot.load_snapshot(snapshot.hash_source(b"workbook", b"decoded"), path) is None
+
+def test_missing_snapshot(tmp_path):
+    assert snapshot.load_snapshot(snapshot.hash_source(b"workbook"), str(tmp_path / "missing.bin")) is None
+
+def test_truncated_or_padded_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "catalog.bin"
+    source_hash = snapshot.hash_source(b"workbook")
+    snapshot.save_snapshot(PERKS, source_hash, str(path))
+    data = path.read_bytes()
+
+    path.write_bytes(data[:-5])
+    assert snapshot.load_snapshot(source_hash, str(path)) is None
+
+    path.write_bytes(data + b"\x00")
+    assert snapshot.load_snapshot(source_hash, str(path)) is None
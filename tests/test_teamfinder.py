@@ -0,0 +1,47 @@
+from teamfinder import build_user_masks, find_team, match_perk_names
+
+def team_mask(masks, team):
+    covered = 0
+    for user_id in team:
+        covered |= masks[user_id]
+    return covered
+
+def test_build_user_masks_ignores_other_perks():
+    rows = [(1, "A"), (1, "C"), (2, "B"), (3, "Other")]
+    assert build_user_masks(rows, ["A", "B", "C"]) == {1: 0b101, 2: 0b010}
+
+def test_exact_search_beats_greedy():
+    # Greedy takes the four-perk member first and then needs two more
+    masks = {1: 0b000111, 2: 0b111000, 3: 0b011011}
+    team, covered = find_team(masks, 6)
+
+    assert sorted(team) == [1, 2]
+    assert covered == 0b111111
+
+def test_size_cap_returns_partial_cover():
+    masks = {1: 0b000111, 2: 0b111000, 3: 0b011011}
+    team, covered = find_team(masks, 6, max_size=1)
+
+    assert team == [3]
+    assert covered == team_mask(masks, team) == 0b011011
+
+def test_uncoverable_perk_is_not_covered():
+    masks = {1: 0b001, 2: 0b010}
+    team, covered = find_team(masks, 3)
+
+    assert sorted(team) == [1, 2]
+    assert covered == 0b011
+
+def test_greedy_fallback_above_exact_limit():
+    masks = {1: 0b000000111111, 2: 0b111111000000, 3: 0b000000000011, 4: 0b100000000000}
+    team, covered = find_team(masks, 12)
+
+    assert sorted(team) == [1, 2]
+    assert covered == (1 << 12) - 1
+
+def test_match_perk_names_with_commas():
+    catalog = ["Gold Pickaxe, Silver Pickaxe", "Gold Pickaxe", "Heal"]
+    parts = ["gold pickaxe", "Silver Pickaxe", "heal", "Unknown"]
+
+    assert match_perk_names(parts, catalog) == (["Gold Pickaxe, Silver Pickaxe", "Heal"], ["Unknown"])
+    assert match_perk_names(["Gold Pickaxe"], catalog) == (["Gold Pickaxe"], [])